@@ -1,111 +1,306 @@
 # app.py
-from flask import Flask, jsonify, render_template, request, current_app
+from flask import Flask, Response, jsonify, render_template, request, current_app
+import orjson
+import gzip
 import os
-import ast
-import json
+import sys
+import bisect
+import copy
 import builtins
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from code_analyzer import EnhancedCodeAnalyzer
 
 app = Flask(__name__, template_folder='templates')
 call_graph_data = {}  # Global variable to store analysis results
+call_graph_body = b"{}"  # /data response body, serialized once per update
+call_graph_body_gzip = gzip.compress(call_graph_body)  # The same body pre-compressed for gzip-capable clients
+call_graph_json = "{}"  # call_graph_data serialized once, reused as the chatbot's code context
+search_text = {}  # Function name -> lowercased name, code and docstring joined by NUL separators
+search_names = []  # Function names in search_text order; search_index refers to them by position
+search_index = {}  # Trigram -> ascending positions of the functions whose search text contains it
+file_analysis_cache = {}  # (real path, mtime_ns, size) -> analysis result for that version of the file
+
+# Below this many files the process pool start-up costs more than it saves.
+PARALLEL_MIN_FILES = 4
+
+# Without a process pool, files are read by this many threads, at most READ_AHEAD_DEPTH ahead of the parser.
+READ_AHEAD_WORKERS = 4
+READ_AHEAD_DEPTH = 16
+
+# Directories that never hold project sources; skipped along with hidden directories and any with 'env' in their name.
+SKIP_DIRS = frozenset({
+    'node_modules', '__pycache__', '.git', '.venv', 'venv', 'dist', 'build',
+    '.mypy_cache', '.tox', '.pytest_cache', '.eggs',
+})
+
+# Names of callable built-ins, computed once; calls to these are never graph edges.
+BUILTIN_CALLABLES = frozenset(name for name, obj in vars(builtins).items() if callable(obj))
 
 def update_call_graph_data(data):
     """Update the global call graph data."""
-    global call_graph_data
+    global call_graph_data, call_graph_body, call_graph_body_gzip, call_graph_json, search_text, search_names, search_index
     call_graph_data.clear()
     call_graph_data.update(data)
+    # Keys are sorted to match what jsonify used to send.
+    call_graph_body = orjson.dumps(call_graph_data, option=orjson.OPT_SORT_KEYS)
+    call_graph_body_gzip = gzip.compress(call_graph_body, compresslevel=6)
+    call_graph_json = call_graph_body.decode()
+    # Lowercase the searchable fields once here instead of on every query.
+    search_text = {
+        func_name: "\0".join((
+            func_name,
+            func_data.get('code', ''),
+            func_data.get('documentation', {}).get('docstring') or '',
+        )).lower()
+        for func_name, func_data in call_graph_data.items()
+    }
+    search_names, search_index = build_search_index(search_text)
 
-# --- Analyzer Functions ---
-class CallGraphAnalyzer(ast.NodeVisitor):
-    def __init__(self, source):
-        self.call_graph = {}
-        self.function_code = {}
-        self.source = source
-        self.current_function = None
-
-    def visit_FunctionDef(self, node):
-        prev_function = self.current_function
-        self.current_function = node.name
-        if node.name not in self.call_graph:
-            self.call_graph[node.name] = []
-        code_snippet = ast.get_source_segment(self.source, node)
-        self.function_code[node.name] = code_snippet if code_snippet else ""
-        self.generic_visit(node)
-        self.current_function = prev_function
-
-    def visit_Call(self, node):
-        if isinstance(node.func, ast.Name):
-            func_name = node.func.id
-        elif isinstance(node.func, ast.Attribute):
-            func_name = node.func.attr
-        else:
-            func_name = "unknown"
-        if self.current_function:
-            self.call_graph[self.current_function].append(func_name)
-        self.generic_visit(node)
+def build_search_index(texts):
+    """
+    Map every three-character substring (trigram) of each function's search
+    text to the positions of the functions containing it.
+    Returns the function names in order together with the index.
+    """
+    names = list(texts)
+    index = defaultdict(list)
+    for position, text in enumerate(texts.values()):
+        for trigram in {text[i:i + 3] for i in range(len(text) - 2)}:
+            index[trigram].append(position)
+    return names, index
 
+def search_candidates(query):
+    """
+    Return the functions that may contain the query, in search_text order.
+    Any text containing the query contains each of its trigrams, so intersecting
+    their postings never drops a match. Queries shorter than a trigram cannot be
+    narrowed and get every function.
+    """
+    if len(query) < 3:
+        return search_names
+    postings = sorted((search_index.get(query[i:i + 3], ()) for i in range(len(query) - 2)), key=len)
+    candidates = set(postings[0])
+    for positions in postings[1:]:
+        if not candidates:
+            break
+        candidates.intersection_update(positions)
+    return [search_names[position] for position in sorted(candidates)]
+
+# --- Analyzer Functions ---
 def analyze_file(filepath):
+    """Analyze a single Python file (memoized, see analyze_files)."""
+    return analyze_files([filepath])[0]
+
+def file_cache_key(filepath):
+    """Identify a version of a file by its resolved path, modification time and size."""
+    real_path = os.path.realpath(filepath)
+    stat = os.stat(real_path)
+    return real_path, stat.st_mtime_ns, stat.st_size
+
+def analyze_path(filepath):
+    """Read and analyze one file without memoization; this is what pool workers run."""
+    return analyze_source(read_source(filepath), filepath)
+
+def read_source(filepath):
     with open(filepath, "r", encoding="utf-8") as file:
-        source = file.read()
-    tree = ast.parse(source, filename=filepath)
-    analyzer = CallGraphAnalyzer(source)
-    analyzer.visit(tree)
-    
-    # Enhanced analysis using the new analyzer
+        return file.read()
+
+def analyze_source(source, filepath):
+    """Analyze the already-read source of a Python file."""
+    # The enhanced analyzer also builds the call graph in the same tree traversal.
     enhanced_analyzer = EnhancedCodeAnalyzer(source, filepath)
     analysis_results = enhanced_analyzer.get_analysis_results()
+    call_graph = analysis_results['call_graph']
+    function_code = analysis_results['function_code']
+    
+    # Index smells and security issues by function once instead of rescanning them per function.
+    smells_by_function = defaultdict(list)
+    for smell in analysis_results['code_smells']:
+        smells_by_function[smell['name']].append(smell)
+    issues_by_function = group_issues_by_function(
+        analysis_results['security_vulnerabilities'], analysis_results['function_ranges']
+    )
     
     result = {}
-    for func in analyzer.call_graph:
+    for func in call_graph:
         result[func] = {
-            "code": analyzer.function_code.get(func, ""),
-            "calls": analyzer.call_graph[func],
+            "code": function_code.get(func, ""),
+            "calls": call_graph[func],
             "complexity": analysis_results['complexity_metrics'].get(func, {}),
-            "code_smells": [smell for smell in analysis_results['code_smells'] if smell['name'] == func],
-            "security_issues": [issue for issue in analysis_results['security_vulnerabilities'] if issue.get('line', 0) >= analyzer.function_code[func].count('\n')],
+            "code_smells": smells_by_function.get(func, []),
+            "security_issues": issues_by_function.get(func, []),
             "documentation": analysis_results['documentation'].get(func, {})
         }
     return result
 
+def group_issues_by_function(issues, function_ranges):
+    """
+    Assign each issue to the innermost function whose lines contain it.
+    function_ranges holds (start_line, end_line, name) tuples; issues outside
+    every function are dropped.
+    """
+    function_ranges = sorted(function_ranges)
+    starts = [start for start, _, _ in function_ranges]
+    grouped = defaultdict(list)
+    for issue in issues:
+        line = issue.get('line', 0)
+        # Walk back from the last function starting at or before the line;
+        # the first one that still spans it is the innermost.
+        index = bisect.bisect_right(starts, line) - 1
+        while index >= 0:
+            _, end, name = function_ranges[index]
+            if end >= line:
+                grouped[name].append(issue)
+                break
+            index -= 1
+    return grouped
+
 def analyze_directory(directory):
     """
-    Analyze all Python files in the given directory.
+    Analyze all Python files in the given directory (skipping SKIP_DIRS and directories with 'env' in their name).
     For each function, add:
       - "file": the relative file path where the function is defined.
       - "breadcrumbs": a string showing the file's directory hierarchy.
     Then, filter out calls to functions that are built-ins or not defined in the codebase.
     """
     complete_graph = {}
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if file.endswith(".py"):
-                filepath = os.path.join(root, file)
-                relative_path = os.path.relpath(filepath, directory)
-                file_graph = analyze_file(filepath)
-                for func in file_graph:
-                    file_graph[func]["file"] = relative_path
-                    breadcrumbs = " > ".join(relative_path.split(os.sep))
-                    file_graph[func]["breadcrumbs"] = breadcrumbs
-                complete_graph.update(file_graph)
+    filepaths = list(walk_python_files(directory))
+    for filepath, file_graph in zip(filepaths, analyze_files(filepaths)):
+        relative_path = os.path.relpath(filepath, directory)
+        for func in file_graph:
+            file_graph[func]["file"] = relative_path
+            breadcrumbs = " > ".join(relative_path.split(os.sep))
+            file_graph[func]["breadcrumbs"] = breadcrumbs
+        complete_graph.update(file_graph)
     
-    defined_functions = set(complete_graph.keys())
-    built_in_names = {name for name, obj in vars(builtins).items() if callable(obj)}
-    
-    for func, details in complete_graph.items():
-        details["calls"] = [
-            call for call in details["calls"]
-            if call in defined_functions and call not in built_in_names
-        ]
+    filter_calls(complete_graph)
     return complete_graph
 
+def walk_python_files(directory):
+    """
+    Yield the paths of all Python files under directory, in the same order as os.walk.
+    Uses os.scandir directly so directory entries are classified without an extra
+    stat call each. Hidden directories and files are skipped, as are directories
+    in SKIP_DIRS or with 'env' in their name.
+    """
+    subdirs = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                name = entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if name not in SKIP_DIRS and not name.startswith('.') and 'env' not in name.lower():
+                        subdirs.append(entry.path)
+                elif name.endswith(".py") and not name.startswith("."):
+                    yield entry.path
+    except OSError:
+        # Unreadable directories are skipped, as os.walk does.
+        return
+    for subdir in subdirs:
+        yield from walk_python_files(subdir)
+
+def analyze_files(filepaths):
+    """
+    Analyze several Python files and return their graphs in the same order.
+    Results are memoized in this process per (path, mtime, size), so a file
+    reached more than once is only analyzed once; only files missing from the
+    cache are dispatched. Deep copies are returned so callers can add metadata
+    without touching the cached results.
+    """
+    keys = [file_cache_key(filepath) for filepath in filepaths]
+    missing = list(dict.fromkeys(key for key in keys if key not in file_analysis_cache))
+    for key, result in zip(missing, analyze_uncached([key[0] for key in missing])):
+        file_analysis_cache[key] = result
+    return [copy.deepcopy(file_analysis_cache[key]) for key in keys]
+
+def analyze_uncached(filepaths):
+    """
+    Analyze files without consulting the cache, returning results in order.
+    Files are independent and parsing is CPU-bound, so larger batches are
+    spread over a process pool to get around the GIL. Where worker processes
+    cannot be started, files are parsed here while threads read ahead.
+    """
+    if len(filepaths) < PARALLEL_MIN_FILES:
+        return [analyze_path(filepath) for filepath in filepaths]
+    workers = os.cpu_count() or 1
+    if sys.platform == 'win32':
+        # ProcessPoolExecutor refuses more than 61 workers on Windows.
+        workers = min(workers, 61)
+    chunksize = max(1, len(filepaths) // (workers * 4))
+    executor = start_process_pool(workers)
+    if executor is None:
+        return [analyze_source(source, filepath) for filepath, source in read_ahead(filepaths)]
+    # Errors raised while analyzing a file propagate, as they do in the serial path.
+    with executor:
+        return list(executor.map(analyze_path, filepaths, chunksize=chunksize))
+
+def start_process_pool(workers):
+    """
+    Create a process pool and make sure its workers actually start.
+    Returns None on platforms or builds where worker processes are unavailable.
+    """
+    executor = None
+    try:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        # Workers are spawned lazily; a trivial task surfaces start-up failures here.
+        executor.submit(_worker_ready).result()
+    except (OSError, ImportError, NotImplementedError, BrokenProcessPool):
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return None
+    return executor
+
+def _worker_ready():
+    return True
+
+def read_ahead(filepaths):
+    """
+    Yield (filepath, source) pairs in order while a small thread pool reads the
+    following files in the background, overlapping disk I/O with parsing.
+    At most READ_AHEAD_DEPTH files are held in memory at once.
+    """
+    with ThreadPoolExecutor(max_workers=READ_AHEAD_WORKERS) as executor:
+        pending = deque()
+        for filepath in filepaths:
+            pending.append((filepath, executor.submit(read_source, filepath)))
+            if len(pending) >= READ_AHEAD_DEPTH:
+                filepath, future = pending.popleft()
+                yield filepath, future.result()
+        while pending:
+            filepath, future = pending.popleft()
+            yield filepath, future.result()
+
+def filter_calls(complete_graph):
+    """
+    Keep only calls to functions defined in the project that are not built-ins.
+    Repeated calls to the same function are collapsed into a single edge.
+    """
+    allowed = complete_graph.keys() - BUILTIN_CALLABLES
+    for details in complete_graph.values():
+        details["calls"] = list(filter(allowed.__contains__, dict.fromkeys(details.get("calls", []))))
+
 # --- Flask Routes ---
+def json_response(obj, status=200):
+    """Encode obj with orjson; keys are sorted as jsonify sorts them."""
+    return Response(orjson.dumps(obj, option=orjson.OPT_SORT_KEYS), status=status, mimetype='application/json')
+
 @app.route("/")
 def index():
     return render_template("index.html")
 
 @app.route("/data")
 def data():
-    return jsonify(call_graph_data)
+    # Serve the bytes cached by update_call_graph_data instead of re-encoding every request.
+    # The repetitive JSON compresses well, so clients that accept gzip get the compressed copy.
+    if request.accept_encodings['gzip']:
+        response = Response(call_graph_body_gzip, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(call_graph_body, mimetype='application/json')
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
 
 @app.route('/analysis', methods=['POST'])
 def get_analysis():
@@ -114,10 +309,10 @@ def get_analysis():
     function_name = data.get('function')
     
     if not function_name or function_name not in call_graph_data:
-        return jsonify({'error': 'Function not found'}), 404
+        return json_response({'error': 'Function not found'}, 404)
         
     function_data = call_graph_data[function_name]
-    return jsonify({
+    return json_response({
         'complexity': function_data.get('complexity', {}),
         'code_smells': function_data.get('code_smells', []),
         'security_issues': function_data.get('security_issues', []),
@@ -130,14 +325,13 @@ def search_functions():
     data = request.get_json()
     query = data.get('query', '').lower()
     
+    # Only the candidates from the index need the full substring check.
     results = {}
-    for func_name, func_data in call_graph_data.items():
-        if (query in func_name.lower() or 
-            query in func_data.get('code', '').lower() or
-            query in func_data.get('documentation', {}).get('docstring', '').lower()):
-            results[func_name] = func_data
+    for func_name in search_candidates(query):
+        if query in search_text[func_name]:
+            results[func_name] = call_graph_data[func_name]
             
-    return jsonify(results)
+    return json_response(results)
 
 @app.route('/chatbot', methods=['POST'])
 def chatbot_query():
@@ -157,7 +351,7 @@ def call_groq_chat(query):
     """
     try:
         client = current_app.config['GROQ_CLIENT']
-        code_context = json.dumps(call_graph_data)
+        code_context = call_graph_json
         system_message = {
             "role": "system",
             "content": (
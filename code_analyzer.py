@@ -1,27 +1,192 @@
 import ast
 import re
+from collections import defaultdict
+from functools import lru_cache
 from typing import Dict, List, Set, Tuple
-import astroid
-from pylint.checkers import BaseChecker
-from pylint.lint import Run
-import bandit
-from bandit.core import manager
-import radon.complexity as cc
-from radon.visitors import ComplexityVisitor
-import radon.metrics as metrics
-from bandit.core.config import BanditConfig
+
+# Thresholds for the code smell checks.
+LONG_METHOD_LINES = 20
+MAX_PARAMETERS = 5
+
+# Cheap pre-filter for bandit: files mentioning none of these sinks are not scanned.
+_SINK_RE = re.compile(r'\b(eval|exec|subprocess|pickle|yaml|os\.system|shell\s*=\s*True|md5|sha1|__import__)\b')
+
+# Source lines with their endings; like the ast module, only \r\n, \r and \n end a line.
+_LINE_RE = re.compile(r'[^\r\n]*(?:\r\n|\r|\n)|[^\r\n]+$')
+
+# radon and bandit are slow to import, so they are loaded on first use rather than at startup.
+@lru_cache(maxsize=None)
+def _complexity_visitor():
+    from radon.visitors import ComplexityVisitor
+    return ComplexityVisitor
+
+@lru_cache(maxsize=None)
+def _bandit():
+    from bandit.core import manager
+    from bandit.core.config import BanditConfig
+    return manager, BanditConfig
+
+class UnifiedVisitor:
+    """
+    Collect everything the analyzer needs from the AST in a single traversal:
+    the call graph and source of each function, documentation for functions
+    and classes, code smells, and performance issues (nested loops, complex
+    list comprehensions).
+
+    The tree is walked iteratively with an explicit stack and a node-type
+    dispatch table rather than ast.NodeVisitor's recursive getattr lookups.
+    A handler may return a callback, which runs once the node's subtree is done.
+    """
+    def __init__(self, source: str):
+        self.source = source
+        # Split once so each function's source is a slice rather than a fresh
+        # split of the whole file, as ast.get_source_segment would do.
+        self._lines = _LINE_RE.findall(source)
+        self.call_graph = {}
+        self.function_code = {}
+        self.function_ranges = []
+        self.documentation = {}
+        self.code_smells = []
+        self.performance_issues = []
+        self.current_function = None
+        self._for_depth = 0
+
+    def _document(self, node):
+        params = []
+        returns = None
+        if isinstance(node, ast.FunctionDef):
+            for arg in node.args.args:
+                params.append(arg.arg)
+            if node.returns:
+                returns = ast.unparse(node.returns)
+
+        self.documentation[node.name] = {
+            'docstring': ast.get_docstring(node),
+            'parameters': params,
+            'return_type': returns,
+            'line': node.lineno
+        }
+
+    def _source_segment(self, node) -> str:
+        """Return the source text of node; same result as ast.get_source_segment."""
+        first, last = node.lineno - 1, node.end_lineno - 1
+        # Column offsets are UTF-8 byte offsets, so only the edge lines need encoding.
+        if first == last:
+            return self._lines[first].encode()[node.col_offset:node.end_col_offset].decode()
+        head = self._lines[first].encode()[node.col_offset:].decode()
+        tail = self._lines[last].encode()[:node.end_col_offset].decode()
+        return head + ''.join(self._lines[first + 1:last]) + tail
+
+    def _detect_smells(self, node):
+        # Long method smell
+        if node.end_lineno - node.lineno > LONG_METHOD_LINES:
+            self.code_smells.append({
+                'type': 'long_method',
+                'name': node.name,
+                'line': node.lineno,
+                'description': f'Method is too long (> {LONG_METHOD_LINES} lines)'
+            })
+
+        # Too many parameters smell
+        if len(node.args.args) > MAX_PARAMETERS:
+            self.code_smells.append({
+                'type': 'too_many_parameters',
+                'name': node.name,
+                'line': node.lineno,
+                'description': f'Method has too many parameters ({len(node.args.args)})'
+            })
+
+    def visit(self, tree):
+        """Walk the whole tree in source order, dispatching on each node's type."""
+        handlers = self._HANDLERS
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            if callable(node):
+                # Leaving a subtree: restore the state its handler changed.
+                node()
+                continue
+            handler = handlers.get(type(node))
+            if handler is not None:
+                on_exit = handler(self, node)
+                if on_exit is not None:
+                    stack.append(on_exit)
+            # Children are pushed in reverse so they are popped in source order.
+            stack.extend(reversed(list(ast.iter_child_nodes(node))))
+
+    def visit_FunctionDef(self, node):
+        self._document(node)
+        self._detect_smells(node)
+        prev_function = self.current_function
+        prev_for_depth = self._for_depth
+        self.current_function = node.name
+        # A function body does not run on each iteration of a loop it is defined in.
+        self._for_depth = 0
+        if node.name not in self.call_graph:
+            self.call_graph[node.name] = []
+        self.function_code[node.name] = self._source_segment(node)
+        self.function_ranges.append((node.lineno, node.end_lineno, node.name))
+
+        def leave():
+            self.current_function = prev_function
+            self._for_depth = prev_for_depth
+        return leave
+
+    def visit_ClassDef(self, node):
+        self._document(node)
+
+    def visit_For(self, node):
+        # Any loop entered while another is still open is a nested loop.
+        if self._for_depth:
+            self.performance_issues.append({
+                'type': 'nested_loop',
+                'line': node.lineno,
+                'description': 'Nested loops detected - potential performance bottleneck'
+            })
+        self._for_depth += 1
+        return self._leave_for
+
+    def _leave_for(self):
+        self._for_depth -= 1
+
+    def visit_ListComp(self, node):
+        if len(node.generators) > 1:
+            self.performance_issues.append({
+                'type': 'complex_list_comp',
+                'line': node.lineno,
+                'description': 'Complex list comprehension detected'
+            })
+
+    def visit_Call(self, node):
+        if isinstance(node.func, ast.Name):
+            func_name = node.func.id
+        elif isinstance(node.func, ast.Attribute):
+            func_name = node.func.attr
+        else:
+            func_name = "unknown"
+        if self.current_function:
+            self.call_graph[self.current_function].append(func_name)
+
+    _HANDLERS = {
+        ast.FunctionDef: visit_FunctionDef,
+        ast.ClassDef: visit_ClassDef,
+        ast.For: visit_For,
+        ast.ListComp: visit_ListComp,
+        ast.Call: visit_Call,
+    }
 
 class EnhancedCodeAnalyzer:
-    def __init__(self, source_code: str, file_path: str):
+    def __init__(self, source_code: str, file_path: str, tree: ast.AST = None):
         self.source_code = source_code
         self.file_path = file_path
-        self.tree = ast.parse(source_code)
-        self.astroid_tree = astroid.parse(source_code)
+        # Callers that have already parsed the source can hand the tree over.
+        self.tree = tree if tree is not None else ast.parse(source_code)
         
     def calculate_complexity_metrics(self) -> Dict:
         """Calculate various complexity metrics for the code."""
         metrics = {}
-        visitor = ComplexityVisitor.from_code(self.source_code)
+        # Reuse the analyzer's tree rather than letting radon parse the source again.
+        visitor = _complexity_visitor().from_ast(self.tree)
         
         for function in visitor.functions:
             metrics[function.name] = {
@@ -31,41 +196,16 @@ class EnhancedCodeAnalyzer:
             
         return metrics
     
-    def detect_code_smells(self) -> List[Dict]:
-        """Detect common code smells using pylint."""
-        smells = []
-        
-        class SmellChecker(BaseChecker):
-            name = 'smell-checker'
-            priority = -1
-            
-            def visit_functiondef(self, node):
-                # Long method smell
-                if node.lineno and node.end_lineno:
-                    if node.end_lineno - node.lineno > 20:
-                        smells.append({
-                            'type': 'long_method',
-                            'name': node.name,
-                            'line': node.lineno,
-                            'description': 'Method is too long (> 20 lines)'
-                        })
-                
-                # Too many parameters smell
-                if len(node.args.args) > 5:
-                    smells.append({
-                        'type': 'too_many_parameters',
-                        'name': node.name,
-                        'line': node.lineno,
-                        'description': f'Method has too many parameters ({len(node.args.args)})'
-                    })
-        
-        Run([self.file_path], do_exit=False)
-        return smells
-    
     def scan_security_vulnerabilities(self) -> List[Dict]:
         """Scan for security vulnerabilities using bandit."""
         vulnerabilities = []
         
+        # Skip the full bandit run when the file uses no security-sensitive calls.
+        if not _SINK_RE.search(self.source_code):
+            return vulnerabilities
+        
+        manager, BanditConfig = _bandit()
+        
         # Create a default BanditConfig instance
         config = BanditConfig()
 
@@ -88,78 +228,43 @@ class EnhancedCodeAnalyzer:
         """Find duplicated code blocks."""
         duplications = []
         
-        # Simple token-based duplication detection
-        lines = self.source_code.split('\n')
-        for i in range(len(lines)):
-            for j in range(i + 1, len(lines)):
-                if lines[i] == lines[j] and len(lines[i].strip()) > 0:
-                    duplications.append({
-                        'line1': i + 1,
-                        'line2': j + 1,
-                        'code': lines[i]
-                    })
-                    
-        return duplications
-    
-    def analyze_performance(self) -> Dict:
-        """Analyze code for potential performance issues."""
-        performance_issues = []
+        # Group identical non-blank lines in a single pass. Lines are compared as
+        # bytes, which hash and compare faster than str, and only repeated lines
+        # are decoded back to text.
+        occurrences = defaultdict(list)
+        for lineno, line in enumerate(self.source_code.encode('utf-8', 'replace').splitlines(), 1):
+            if line.strip():
+                occurrences[line].append(lineno)
         
-        # Check for nested loops
-        for node in ast.walk(self.tree):
-            if isinstance(node, ast.For):
-                for child in ast.walk(node):
-                    if isinstance(child, ast.For):
-                        performance_issues.append({
-                            'type': 'nested_loop',
-                            'line': node.lineno,
-                            'description': 'Nested loops detected - potential performance bottleneck'
-                        })
-                        
-        # Check for large list comprehensions
-        for node in ast.walk(self.tree):
-            if isinstance(node, ast.ListComp):
-                if len(node.generators) > 1:
-                    performance_issues.append({
-                        'type': 'complex_list_comp',
-                        'line': node.lineno,
-                        'description': 'Complex list comprehension detected'
-                    })
+        # Pair every repeat with the first occurrence so highly repetitive
+        # files produce a linear rather than quadratic number of entries.
+        for line, linenos in occurrences.items():
+            if len(linenos) < 2:
+                continue
+            code = line.decode('utf-8')
+            first = linenos[0]
+            for lineno in linenos[1:]:
+                duplications.append({
+                    'line1': first,
+                    'line2': lineno,
+                    'code': code
+                })
                     
-        return {'issues': performance_issues}
-    
-    def generate_documentation(self) -> Dict:
-        """Generate documentation for functions and classes."""
-        documentation = {}
-        
-        for node in ast.walk(self.tree):
-            if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
-                doc = ast.get_docstring(node)
-                params = []
-                returns = None
-                
-                if isinstance(node, ast.FunctionDef):
-                    for arg in node.args.args:
-                        params.append(arg.arg)
-                    if node.returns:
-                        returns = ast.unparse(node.returns)
-                
-                documentation[node.name] = {
-                    'docstring': doc,
-                    'parameters': params,
-                    'return_type': returns,
-                    'line': node.lineno
-                }
-                
-        return documentation
+        return duplications
     
     def get_analysis_results(self) -> Dict:
         """Get all analysis results in a single dictionary."""
+        # Call graph, documentation, smell and performance checks share one tree traversal.
+        visitor = UnifiedVisitor(self.source_code)
+        visitor.visit(self.tree)
         return {
             'complexity_metrics': self.calculate_complexity_metrics(),
-            'code_smells': self.detect_code_smells(),
+            'code_smells': visitor.code_smells,
             'security_vulnerabilities': self.scan_security_vulnerabilities(),
             'code_duplication': self.find_code_duplication(),
-            'performance_analysis': self.analyze_performance(),
-            'documentation': self.generate_documentation()
+            'performance_analysis': {'issues': visitor.performance_issues},
+            'documentation': visitor.documentation,
+            'call_graph': visitor.call_graph,
+            'function_code': visitor.function_code,
+            'function_ranges': visitor.function_ranges
         } 
\ No newline at end of file
@@ -1,17 +1,17 @@
 # main.py
 import sys
 import os
-import json
+import multiprocessing
 import threading
 import tkinter as tk
 from tkinter import filedialog
 import time
 import webview
-import builtins
+import orjson
 from dotenv import load_dotenv  # Load environment variables
 from groq import Groq
 from flask import Flask
-from app import app, update_call_graph_data,analyze_file  # Import the Flask app from app.py
+from app import app, update_call_graph_data, analyze_files, filter_calls, walk_python_files  # Import the Flask app from app.py
 
 # Load environment variables from .env file
 load_dotenv(os.path.join(os.path.dirname(__file__), '.env'))
@@ -29,43 +29,32 @@ app.config['GROQ_CLIENT'] = client  # Store the client in the app's config
 
 def analyze_directory(directory):
     """
-    Analyze all Python files in the given directory (ignoring 'node_modules' and directories with 'env' in their name).
+    Analyze all Python files in the given directory (ignoring build/cache/VCS directories such as 'node_modules' and '.git', and directories with 'env' in their name).
     For each function found, add the following metadata:
       - "file": Relative file path from the project root.
       - "breadcrumbs": A string showing the file's directory hierarchy.
     Then filter out call references to functions that are built-ins or not defined anywhere in the project.
     """
     complete_graph = {}
-    for root, dirs, files in os.walk(directory):
-        # Ignore 'node_modules' and any directory that contains 'env' in its name.
-        if 'node_modules' in dirs:
-            dirs.remove('node_modules')
-        dirs[:] = [d for d in dirs if 'env' not in d.lower()]
-        
-        for file in files:
-            if file.endswith(".py"):
-                filepath = os.path.join(root, file)
-                file_graph = analyze_file(filepath)
-                # Compute the relative path from the project root.
-                relative_path = os.path.relpath(filepath, directory)
-                # Create breadcrumbs by joining the parts of the relative path.
-                breadcrumbs = " > ".join(relative_path.split(os.sep))
-                # Add file metadata for each function.
-                for func_name, func_info in file_graph.items():
-                    if func_info.get('code'):  # Only include functions with code.
-                        file_graph[func_name]["file"] = relative_path
-                        file_graph[func_name]["breadcrumbs"] = breadcrumbs
-                        complete_graph[func_name] = file_graph[func_name]
+    # Ignore SKIP_DIRS (node_modules, .git, __pycache__, ...) and any directory that contains 'env' in its name.
+    filepaths = list(walk_python_files(directory))
+    
+    # Analyze all files up front (in parallel for larger projects), then merge.
+    for filepath, file_graph in zip(filepaths, analyze_files(filepaths)):
+        # Compute the relative path from the project root.
+        relative_path = os.path.relpath(filepath, directory)
+        # Create breadcrumbs by joining the parts of the relative path.
+        breadcrumbs = " > ".join(relative_path.split(os.sep))
+        # Add file metadata for each function.
+        for func_name, func_info in file_graph.items():
+            if func_info.get('code'):  # Only include functions with code.
+                file_graph[func_name]["file"] = relative_path
+                file_graph[func_name]["breadcrumbs"] = breadcrumbs
+                complete_graph[func_name] = file_graph[func_name]
     
     # Filtering step:
     # Only keep calls that refer to functions defined in the project and that are not built-ins.
-    defined_functions = set(complete_graph.keys())
-    built_in_names = {name for name, obj in vars(builtins).items() if callable(obj)}
-    for func, details in complete_graph.items():
-        details["calls"] = [
-            call for call in details.get("calls", [])
-            if call in defined_functions and call not in built_in_names
-        ]
+    filter_calls(complete_graph)
     return complete_graph
 
 def select_directory():
@@ -75,6 +64,9 @@ def select_directory():
     return filedialog.askdirectory(title="Select Project Directory")
 
 if __name__ == "__main__":
+    # Needed so the analysis process pool works in the frozen (PyInstaller) build.
+    multiprocessing.freeze_support()
+    
     # 1. Ask the user to select a project directory.
     selected_dir = select_directory()
     if not selected_dir:
@@ -100,13 +92,13 @@ if __name__ == "__main__":
     # 6. Check if the JSON file already exists; if not, perform analysis.
     if os.path.exists(json_file_path):
         print(f"JSON for project '{project_name}' found. Loading analysis from {json_file_path}.")
-        with open(json_file_path, "r", encoding="utf-8") as f:
-            project_data = json.load(f)
+        with open(json_file_path, "rb") as f:
+            project_data = orjson.loads(f.read())
     else:
         print(f"Analyzing directory: {selected_dir}")
         project_data = analyze_directory(selected_dir)
-        with open(json_file_path, "w", encoding="utf-8") as f:
-            json.dump(project_data, f, indent=2)
+        with open(json_file_path, "wb") as f:
+            f.write(orjson.dumps(project_data, option=orjson.OPT_INDENT_2))
         print(f"Analysis complete. JSON file generated at: {json_file_path}")
     
     # 7. Update the Flask app's global data using the updater function.